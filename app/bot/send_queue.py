@@ -0,0 +1,161 @@
+"""
+📬 Outgoing Message Queue
+Paces bot replies under Telegram's global rate limit
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+
+from telegram.error import RetryAfter
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = 1
+
+# Telegram allows roughly 30 messages per second across all chats
+RATE_LIMIT = 30
+# Low-priority messages are dropped once this many sends are waiting
+LOW_PRIORITY_BACKLOG = 30
+MAX_RETRIES = 3
+# Seconds stop() waits for queued messages to go out before giving up on them
+DRAIN_TIMEOUT = 5.0
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class SendQueue:
+    """Priority queue with round-robin fairness between chats"""
+
+    def __init__(self, rate: float = RATE_LIMIT):
+        self._bucket = TokenBucket(rate, rate)
+        # One chat_id -> deque mapping per priority, highest priority first
+        self._levels = {p: OrderedDict() for p in (PRIORITY_NORMAL, PRIORITY_LOW)}
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self._closed = False
+
+    def submit(self, chat_id, send, kwargs: dict, priority: int = PRIORITY_NORMAL) -> asyncio.Future:
+        """Queue `send(**kwargs)`; the future resolves to its result (None if dropped or failed)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        if self._closed or (priority == PRIORITY_LOW and self._pending >= LOW_PRIORITY_BACKLOG):
+            future.set_result(None)
+            return future
+
+        self._levels[priority].setdefault(chat_id, deque()).append((send, kwargs, future))
+        self._pending += 1
+        self._wakeup.set()
+
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        return future
+
+    def _next(self):
+        for chats in self._levels.values():
+            if chats:
+                chat_id, items = chats.popitem(last=False)
+                item = items.popleft()
+                if items:
+                    # Back of the line so other chats get a turn
+                    chats[chat_id] = items
+                self._pending -= 1
+                return item
+        return None
+
+    async def _deliver(self, send, kwargs: dict):
+        for _ in range(MAX_RETRIES):
+            await self._bucket.acquire()
+            try:
+                return await send(**kwargs)
+            except RetryAfter as e:
+                logger.warning(f"⚠️ Flood control hit, retrying in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to send message: {e}")
+                return None
+        return None
+
+    async def _run(self):
+        while True:
+            item = self._next()
+            if item is None:
+                if self._closed:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            send, kwargs, future = item
+            result = None
+            try:
+                result = await self._deliver(send, kwargs)
+            finally:
+                # Resolve even when cancelled mid-send so no caller waits forever
+                if not future.done():
+                    future.set_result(result)
+
+    async def stop(self, timeout: float = DRAIN_TIMEOUT):
+        """Stop accepting messages, deliver what is queued within `timeout` seconds, drop the rest"""
+        self._closed = True
+        if self._worker and not self._worker.done():
+            self._wakeup.set()
+            try:
+                # Cancels the worker if it doesn't drain in time
+                await asyncio.wait_for(self._worker, timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+        self._worker = None
+
+        for chats in self._levels.values():
+            for items in chats.values():
+                for _, _, future in items:
+                    if not future.done():
+                        future.set_result(None)
+            chats.clear()
+        self._pending = 0
+
+
+_queue = SendQueue()
+
+
+def enqueue_send(bot, chat_id, text: str, priority: int = PRIORITY_NORMAL, **kwargs) -> asyncio.Future:
+    """Queue a new message; await the result to get the sent Message"""
+    return _queue.submit(chat_id, bot.send_message, dict(chat_id=chat_id, text=text, **kwargs), priority)
+
+
+def enqueue_edit(bot, chat_id, message_id: int, text: str, priority: int = PRIORITY_NORMAL, **kwargs) -> asyncio.Future:
+    """Queue an edit of an existing message"""
+    return _queue.submit(
+        chat_id,
+        bot.edit_message_text,
+        dict(chat_id=chat_id, message_id=message_id, text=text, **kwargs),
+        priority
+    )
+
+
+async def stop():
+    """Flush the queue and stop sending; call after the bot stops handling updates"""
+    await _queue.stop()
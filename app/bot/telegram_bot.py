@@ -4,36 +4,82 @@ Main bot logic for DevOps Learning Assistant
 """
 
 import os
+import re
+import asyncio
+import time
 import logging
+from collections import OrderedDict
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application, CommandHandler, MessageHandler, 
     CallbackQueryHandler, ContextTypes, filters
 )
 
+from app.bot import send_queue
 from app.modules import docker_sandbox, kubernetes_concepts, yaml_validator
 from app.modules import cicd_visualizer, interview_qa, ai_error_explainer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# User state tracking
-user_modes = {}
 
+class LRUDict(OrderedDict):
+    """Dict that evicts the least recently used key once maxsize is reached"""
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /start command"""
-    keyboard = [
-        [InlineKeyboardButton("🐳 Docker", callback_data="menu_docker"),
-         InlineKeyboardButton("☸️ Kubernetes", callback_data="menu_k8s")],
-        [InlineKeyboardButton("🧪 CI/CD", callback_data="menu_cicd"),
-         InlineKeyboardButton("📊 YAML", callback_data="menu_yaml")],
-        [InlineKeyboardButton("📝 Quiz", callback_data="menu_quiz"),
-         InlineKeyboardButton("🧠 AI Error", callback_data="menu_ai")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    welcome = """🚀 **DevOps Learning Assistant**
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default=None):
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+        return default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+# User state tracking (bounded so it can't grow forever)
+user_modes = LRUDict(maxsize=int(os.getenv("USER_MODE_CACHE", "100000")))
+
+# Message classifiers used by handle_message
+_ERROR_KW_RE = re.compile(r"error|exception|failed|denied", re.IGNORECASE)
+_YAML_PREFIX_RE = re.compile(r"\s*(?:apiVersion|name|version|services):")
+
+# K8s concept commands (/pod, /deployment, ...) handled by one regex filter
+_CONCEPT_RE = re.compile(
+    r"^/(pod|deployment|service|configmap|secret|ingress|namespace)(?:@(\w+))?(?:\s|$)", re.IGNORECASE
+)
+
+# Inline button callback data -> (user mode, menu text getter)
+_MENU_BUTTONS = {
+    "menu_docker": ("docker", docker_sandbox.get_docker_menu),
+    "menu_k8s": ("kubernetes", kubernetes_concepts.get_kubernetes_menu),
+    "menu_cicd": ("cicd", cicd_visualizer.get_cicd_menu),
+    "menu_yaml": ("yaml", yaml_validator.get_yaml_menu),
+    "menu_quiz": ("quiz", interview_qa.get_interview_menu),
+    "menu_ai": ("ai", ai_error_explainer.get_ai_menu),
+}
+
+# Minimum seconds between edits while streaming an AI answer
+_STREAM_EDIT_INTERVAL = 1.0
+
+# /start menu is static, so build it once
+_START_KEYBOARD = [
+    [InlineKeyboardButton("🐳 Docker", callback_data="menu_docker"),
+     InlineKeyboardButton("☸️ Kubernetes", callback_data="menu_k8s")],
+    [InlineKeyboardButton("🧪 CI/CD", callback_data="menu_cicd"),
+     InlineKeyboardButton("📊 YAML", callback_data="menu_yaml")],
+    [InlineKeyboardButton("📝 Quiz", callback_data="menu_quiz"),
+     InlineKeyboardButton("🧠 AI Error", callback_data="menu_ai")]
+]
+_START_MARKUP = InlineKeyboardMarkup(_START_KEYBOARD)
+
+_START_WELCOME = """🚀 **DevOps Learning Assistant**
 
 Welcome! I'll help you learn:
 • 🐳 Docker commands
@@ -46,7 +92,33 @@ Welcome! I'll help you learn:
 Select a topic below or use commands:
 /docker /kubernetes /cicd /yaml /quiz /explain"""
 
-    await update.message.reply_text(welcome, reply_markup=reply_markup, parse_mode="Markdown")
+
+def _reply(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str, **kwargs):
+    """Queue a reply to the chat the update came from"""
+    chat = update.effective_chat
+    # Quote the user's message outside private chats, like Message.reply_text does
+    if chat.type != "private" and update.effective_message:
+        kwargs.setdefault("reply_to_message_id", update.effective_message.message_id)
+    return send_queue.enqueue_send(context.bot, chat.id, text, **kwargs)
+
+
+def _edit(query, context: ContextTypes.DEFAULT_TYPE, text: str, **kwargs):
+    """Queue an edit of the message a button was pressed on"""
+    return send_queue.enqueue_edit(context.bot, query.message.chat_id, query.message.message_id, text, **kwargs)
+
+
+def _with_explanation(result: dict, lang: str) -> str:
+    """Append the localized explanation (falling back to English) to a simulator's output"""
+    explanation = result.get("explanation")
+    if not explanation:
+        return result["output"]
+    exp = explanation.get(lang) or explanation.get("en", "")
+    return f"{result['output']}\n\n{exp}"
+
+
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /start command"""
+    _reply(update, context, _START_WELCOME, reply_markup=_START_MARKUP, parse_mode="Markdown")
 
 
 async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -57,53 +129,35 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = str(query.from_user.id)
     data = query.data
     
-    if data == "menu_docker":
-        user_modes[user_id] = "docker"
-        await query.edit_message_text(docker_sandbox.get_docker_menu(), parse_mode="Markdown")
-    
-    elif data == "menu_k8s":
-        user_modes[user_id] = "kubernetes"
-        await query.edit_message_text(kubernetes_concepts.get_kubernetes_menu(), parse_mode="Markdown")
-    
-    elif data == "menu_cicd":
-        user_modes[user_id] = "cicd"
-        await query.edit_message_text(cicd_visualizer.get_cicd_menu(), parse_mode="Markdown")
-    
-    elif data == "menu_yaml":
-        user_modes[user_id] = "yaml"
-        await query.edit_message_text(yaml_validator.get_yaml_menu(), parse_mode="Markdown")
-    
-    elif data == "menu_quiz":
-        user_modes[user_id] = "quiz"
-        await query.edit_message_text(interview_qa.get_interview_menu(), parse_mode="Markdown")
-    
-    elif data == "menu_ai":
-        user_modes[user_id] = "ai"
-        await query.edit_message_text(ai_error_explainer.get_ai_menu(), parse_mode="Markdown")
+    menu = _MENU_BUTTONS.get(data)
+    if menu:
+        mode, get_menu = menu
+        user_modes[user_id] = mode
+        _edit(query, context, get_menu(), parse_mode="Markdown")
 
 
 async def docker_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /docker command"""
     user_modes[str(update.effective_user.id)] = "docker"
-    await update.message.reply_text(docker_sandbox.get_docker_menu(), parse_mode="Markdown")
+    _reply(update, context, docker_sandbox.get_docker_menu(), parse_mode="Markdown")
 
 
 async def kubernetes_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /kubernetes command"""
     user_modes[str(update.effective_user.id)] = "kubernetes"
-    await update.message.reply_text(kubernetes_concepts.get_kubernetes_menu(), parse_mode="Markdown")
+    _reply(update, context, kubernetes_concepts.get_kubernetes_menu(), parse_mode="Markdown")
 
 
 async def cicd_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /cicd command"""
     user_modes[str(update.effective_user.id)] = "cicd"
-    await update.message.reply_text(cicd_visualizer.get_cicd_menu(), parse_mode="Markdown")
+    _reply(update, context, cicd_visualizer.get_cicd_menu(), parse_mode="Markdown")
 
 
 async def yaml_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /yaml command"""
     user_modes[str(update.effective_user.id)] = "yaml"
-    await update.message.reply_text(yaml_validator.get_yaml_menu(), parse_mode="Markdown")
+    _reply(update, context, yaml_validator.get_yaml_menu(), parse_mode="Markdown")
 
 
 async def quiz_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -118,7 +172,8 @@ async def quiz_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     session = interview_qa.get_quiz_session(user_id)
     question = session.start(category)
     
-    await update.message.reply_text(
+    _reply(
+        update, context,
         f"📝 **Question {question['number']}** ({question['category']})\n\n{question['question']}\n\n_Use /answer to reveal, /next for next question_",
         parse_mode="Markdown"
     )
@@ -133,7 +188,7 @@ async def answer_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = "si" if context.args and "si" in context.args else "en"
     answer = session.reveal_answer(lang)
     
-    await update.message.reply_text(answer, parse_mode="Markdown")
+    _reply(update, context, answer, parse_mode="Markdown")
 
 
 async def next_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -142,7 +197,8 @@ async def next_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     session = interview_qa.get_quiz_session(user_id)
     question = session.next_question()
     
-    await update.message.reply_text(
+    _reply(
+        update, context,
         f"📝 **Question {question['number']}**\n\n{question['question']}",
         parse_mode="Markdown"
     )
@@ -151,19 +207,26 @@ async def next_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def explain_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /explain command"""
     user_modes[str(update.effective_user.id)] = "ai"
-    await update.message.reply_text(ai_error_explainer.get_ai_menu(), parse_mode="Markdown")
+    _reply(update, context, ai_error_explainer.get_ai_menu(), parse_mode="Markdown")
 
 
 async def concept_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle K8s concept commands like /pod, /deployment, etc."""
-    concept = update.message.text.strip("/").lower()
-    lang = "si" if context.args and "si" in context.args else "en"
+    match = context.matches[0]
+    # In groups, /pod@OtherBot is meant for another bot
+    mention = match.group(2)
+    if mention and mention.lower() != (context.bot.username or "").lower():
+        return
+    
+    concept = match.group(1).lower()
+    args = update.message.text.split()[1:]
+    lang = "si" if "si" in args else "en"
     
     explanation = kubernetes_concepts.get_concept(concept, lang)
     if explanation:
-        await update.message.reply_text(explanation, parse_mode="Markdown")
+        _reply(update, context, explanation, parse_mode="Markdown")
     else:
-        await update.message.reply_text(f"❓ Unknown concept: {concept}")
+        _reply(update, context, f"❓ Unknown concept: {concept}")
 
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -178,59 +241,78 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         text = text[:-3].strip()
     
     if mode == "docker" and text.lower().startswith("docker"):
-        result = docker_sandbox.simulate_docker(text)
-        response = result["output"]
-        if result.get("explanation"):
-            exp = result["explanation"].get(lang, result["explanation"].get("en", ""))
-            response += f"\n\n{exp}"
-        await update.message.reply_text(response, parse_mode="Markdown")
+        result = docker_sandbox.simulate_docker(text, user_id)
+        response = _with_explanation(result, lang)
+        _reply(update, context, response, parse_mode="Markdown")
     
     elif mode == "kubernetes" and text.lower().startswith("kubectl"):
         result = kubernetes_concepts.simulate_kubectl(text)
-        response = result["output"]
-        if result.get("explanation"):
-            exp = result["explanation"].get(lang, result["explanation"].get("en", ""))
-            response += f"\n\n{exp}"
-        await update.message.reply_text(response, parse_mode="Markdown")
+        response = _with_explanation(result, lang)
+        _reply(update, context, response, parse_mode="Markdown")
     
-    elif mode == "yaml" or text.strip().startswith(("apiVersion:", "name:", "version:", "services:")):
+    elif mode == "yaml" or _YAML_PREFIX_RE.match(text):
         result = yaml_validator.validate_yaml(text)
         response = result["output"]
         if result.get("explanation"):
             response += f"\n\n{result['explanation']}"
-        await update.message.reply_text(response, parse_mode="Markdown")
+        _reply(update, context, response, parse_mode="Markdown")
     
     elif mode == "cicd":
         if text.lower().startswith("sample"):
             sample = cicd_visualizer.get_sample(text)
             if sample:
-                workflow = cicd_visualizer.parse_workflow(sample["yaml"])
+                workflow = sample["workflow"]
                 response = cicd_visualizer.visualize_pipeline(workflow)
                 response += f"\n\n{cicd_visualizer.explain_workflow(workflow, lang)}"
             else:
                 response = "❓ Unknown sample. Try: `sample nodejs` or `sample docker`"
         else:
-            workflow = cicd_visualizer.parse_workflow(text)
+            # PyYAML is CPU-bound; parse off the event loop
+            workflow = await asyncio.get_running_loop().run_in_executor(
+                None, cicd_visualizer.parse_workflow, text
+            )
             response = cicd_visualizer.visualize_pipeline(workflow)
             if workflow.get("success"):
                 response += f"\n\n{cicd_visualizer.explain_workflow(workflow, lang)}"
-        await update.message.reply_text(response, parse_mode="Markdown")
+        _reply(update, context, response, parse_mode="Markdown")
     
-    elif mode == "ai" or any(err in text.lower() for err in ["error", "exception", "failed", "denied"]):
-        await update.message.reply_text("🔄 Analyzing error...", parse_mode="Markdown")
-        response = await ai_error_explainer.explain_error(text, lang)
-        await update.message.reply_text(response, parse_mode="Markdown")
+    elif mode == "ai" or _ERROR_KW_RE.search(text) is not None:
+        # Stream the answer into the placeholder, throttled to avoid flooding edits.
+        # The placeholder is low priority and dropped under load (the answer is then sent as a new
+        # message). It is only awaited before the first edit, so the AI stream starts right away.
+        sending_placeholder = _reply(
+            update, context, "🔄 Analyzing error...", priority=send_queue.PRIORITY_LOW, parse_mode="Markdown"
+        )
+        response = None
+        last_edit = time.monotonic()
+        async for response in ai_error_explainer.explain_error_stream(text, lang):
+            now = time.monotonic()
+            if now - last_edit >= _STREAM_EDIT_INTERVAL:
+                last_edit = now
+                placeholder = await sending_placeholder
+                if placeholder:
+                    send_queue.enqueue_edit(context.bot, placeholder.chat_id, placeholder.message_id, response)
+        
+        response = response or ai_error_explainer.get_fallback_explanation(text, lang)
+        placeholder = await sending_placeholder
+        if placeholder:
+            send_queue.enqueue_edit(
+                context.bot, placeholder.chat_id, placeholder.message_id, response, parse_mode="Markdown"
+            )
+        else:
+            _reply(update, context, response, parse_mode="Markdown")
     
     else:
         # Try to auto-detect command type
         if text.lower().startswith("docker"):
-            result = docker_sandbox.simulate_docker(text)
-            await update.message.reply_text(result["output"], parse_mode="Markdown")
+            result = docker_sandbox.simulate_docker(text, user_id)
+            _reply(update, context, result["output"], parse_mode="Markdown")
         elif text.lower().startswith("kubectl"):
             result = kubernetes_concepts.simulate_kubectl(text)
-            await update.message.reply_text(result["output"], parse_mode="Markdown")
+            _reply(update, context, result["output"], parse_mode="Markdown")
         else:
-            await update.message.reply_text(
+            _reply(
+                update, context,
                 "💡 Use /start to see available options or type:\n• `docker <command>`\n• `kubectl <command>`",
                 parse_mode="Markdown"
             )
@@ -258,8 +340,7 @@ def create_bot_application():
     application.add_handler(CommandHandler("explain", explain_command))
     
     # K8s concept commands
-    for concept in ["pod", "deployment", "service", "configmap", "secret", "ingress", "namespace"]:
-        application.add_handler(CommandHandler(concept, concept_command))
+    application.add_handler(MessageHandler(filters.Regex(_CONCEPT_RE), concept_command))
     
     # Button callback handler
     application.add_handler(CallbackQueryHandler(button_handler))
@@ -4,36 +4,80 @@ Uses OpenAI to explain error logs with Sinhala support
 """
 
 import os
+import re
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict, namedtuple
+import httpx
 from openai import AsyncOpenAI
 
+logger = logging.getLogger(__name__)
+
 client = None
 
+# Recent AI answers keyed by (error log digest, language)
+_AI_CACHE = OrderedDict()
+_AI_CACHE_SIZE = 2048
+
+# explain_error requests arriving within BATCH_WINDOW seconds share one API call
+BATCH_WINDOW = 0.05
+BATCH_MAX = 8
+_PendingRequest = namedtuple("_PendingRequest", "error_log language future")
+_batch = []
+_batch_timer = None
+_batch_tasks = set()
+_BATCH_SEPARATOR_RE = re.compile(r"^\s*---\s*$", re.MULTILINE)
+
 
-def init_openai():
-    """Initialize OpenAI client"""
+def init_openai(http_client: httpx.AsyncClient = None) -> bool:
+    """Initialize the shared OpenAI client; call once at startup"""
     global client
+    if client:
+        return True
     api_key = os.getenv("OPENAI_API_KEY")
     if api_key and api_key != "your_openai_api_key_here":
-        client = AsyncOpenAI(api_key=api_key)
+        if http_client is None:
+            http_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+            )
+        client = AsyncOpenAI(api_key=api_key, http_client=http_client)
         return True
     return False
 
 
-async def explain_error(error_log: str, language: str = "en") -> str:
-    """Explain error log using AI"""
-    if not client:
-        if not init_openai():
-            return get_fallback_explanation(error_log, language)
-    
-    try:
-        lang_instruction = "Respond in Sinhala (සිංහල)" if language == "si" else "Respond in English"
-        
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"""You are a DevOps expert helping students understand error logs.
+async def close_openai():
+    """Close the shared OpenAI client and its connection pool"""
+    global client
+    if client:
+        await client.close()
+        client = None
+
+
+def _cache_key(error_log: str, language: str) -> tuple:
+    # Only the first 2000 chars are sent to the model, so only they matter
+    digest = hashlib.blake2b(error_log[:2000].encode(), digest_size=16).digest()
+    return (digest, language)
+
+
+def _cache_get(key: tuple):
+    response = _AI_CACHE.get(key)
+    if response is not None:
+        _AI_CACHE.move_to_end(key)
+    return response
+
+
+def _cache_put(key: tuple, response: str):
+    _AI_CACHE[key] = response
+    _AI_CACHE.move_to_end(key)
+    if len(_AI_CACHE) > _AI_CACHE_SIZE:
+        _AI_CACHE.popitem(last=False)
+
+
+def _system_prompt(language: str) -> str:
+    lang_instruction = "Respond in Sinhala (සිංහල)" if language == "si" else "Respond in English"
+    return f"""You are a DevOps expert helping students understand error logs.
 {lang_instruction}
 
 Analyze the error and explain:
@@ -43,74 +87,247 @@ Analyze the error and explain:
 4. Prevention tips
 
 Keep it concise and beginner-friendly."""
-                },
+
+
+async def explain_error_stream(error_log: str, language: str = "en"):
+    """Explain error log using AI, yielding the response text as it grows"""
+    if not client:
+        yield get_fallback_explanation(error_log, language)
+        return
+    
+    key = _cache_key(error_log, language)
+    cached = _cache_get(key)
+    if cached is not None:
+        yield cached
+        return
+    
+    try:
+        stream = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": _system_prompt(language)},
                 {
                     "role": "user",
                     "content": f"Explain this error:\n\n```\n{error_log[:2000]}\n```"
                 }
             ],
             max_tokens=800,
-            temperature=0.7
+            temperature=0.7,
+            stream=True
         )
         
-        return f"🧠 **AI Analysis:**\n\n{response.choices[0].message.content}"
+        content = ""
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                content += chunk.choices[0].delta.content
+                yield f"🧠 **AI Analysis:**\n\n{content}"
         
+        if content:
+            _cache_put(key, f"🧠 **AI Analysis:**\n\n{content}")
+        
+    except Exception as e:
+        yield get_fallback_explanation(error_log, language)
+
+
+async def _explain_single(error_log: str, language: str) -> str:
+    response = None
+    async for response in explain_error_stream(error_log, language):
+        pass
+    return response or get_fallback_explanation(error_log, language)
+
+
+async def _explain_many(error_logs: list, language: str) -> list:
+    """Explain several errors with one API call, splitting the answer on --- lines"""
+    errors = "\n\n".join(
+        f"Error {i}:\n```\n{log[:2000]}\n```" for i, log in enumerate(error_logs, 1)
+    )
+    try:
+        response = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": _system_prompt(language) + f"""
+
+You will receive {len(error_logs)} separate errors. Explain each one on its own, in the order given, \
+and separate the explanations with a line containing only ---"""
+                },
+                {"role": "user", "content": errors}
+            ],
+            max_tokens=800 * len(error_logs),
+            temperature=0.7
+        )
+        content = response.choices[0].message.content or ""
     except Exception as e:
+        # Retrying each error would just repeat the failing call N times
+        logger.warning(f"⚠️ Batched explanation of {len(error_logs)} errors failed: {e}")
+        return [get_fallback_explanation(log, language) for log in error_logs]
+    
+    parts = [part.strip() for part in _BATCH_SEPARATOR_RE.split(content) if part.strip()]
+    if len(parts) != len(error_logs):
+        # The model didn't follow the format; answer each error on its own
+        logger.warning(
+            f"⚠️ Batched explanation returned {len(parts)} parts for {len(error_logs)} errors, "
+            "retrying them one by one"
+        )
+        return await asyncio.gather(*(_explain_single(log, language) for log in error_logs))
+    
+    results = []
+    for log, part in zip(error_logs, parts):
+        result = f"🧠 **AI Analysis:**\n\n{part}"
+        _cache_put(_cache_key(log, language), result)
+        results.append(result)
+    return results
+
+
+async def _run_batch(language: str, requests: list):
+    # Identical logs are asked about once and every caller gets the same answer
+    by_key = {}
+    for request in requests:
+        by_key.setdefault(_cache_key(request.error_log, language), []).append(request)
+    groups = list(by_key.values())
+    error_logs = [group[0].error_log for group in groups]
+    
+    try:
+        try:
+            if len(error_logs) == 1:
+                results = [await _explain_single(error_logs[0], language)]
+            else:
+                results = await _explain_many(error_logs, language)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to explain {len(error_logs)} errors: {e}")
+            results = [get_fallback_explanation(log, language) for log in error_logs]
+        
+        for group, result in zip(groups, results):
+            for request in group:
+                if not request.future.done():
+                    request.future.set_result(result)
+    finally:
+        # Never leave a caller waiting, even if the fallback raised or this task was cancelled
+        for request in requests:
+            if not request.future.done():
+                request.future.set_result(_GENERIC_SI if language == "si" else _GENERIC_EN)
+
+
+def _flush_batch():
+    """Send everything waiting in the batch, one API call per language"""
+    global _batch, _batch_timer
+    pending, _batch = _batch, []
+    if _batch_timer is not None and _batch_timer is not asyncio.current_task():
+        _batch_timer.cancel()
+    _batch_timer = None
+    
+    by_language = {}
+    for request in pending:
+        by_language.setdefault(request.language, []).append(request)
+    
+    for language, requests in by_language.items():
+        task = asyncio.create_task(_run_batch(language, requests))
+        _batch_tasks.add(task)
+        task.add_done_callback(_batch_tasks.discard)
+
+
+async def _flush_after_window():
+    await asyncio.sleep(BATCH_WINDOW)
+    _flush_batch()
+
+
+async def explain_error(error_log: str, language: str = "en") -> str:
+    """Explain error log using AI"""
+    if not client:
         return get_fallback_explanation(error_log, language)
+    
+    cached = _cache_get(_cache_key(error_log, language))
+    if cached is not None:
+        return cached
+    
+    global _batch_timer
+    future = asyncio.get_running_loop().create_future()
+    _batch.append(_PendingRequest(error_log, language, future))
+    if len(_batch) >= BATCH_MAX:
+        _flush_batch()
+    elif _batch_timer is None:
+        _batch_timer = asyncio.create_task(_flush_after_window())
+    
+    return await future
+
+
+# Fallback error patterns as (pattern, en, si), checked in priority order
+_FALLBACK_PATTERNS = (
+    (
+        "connection refused",
+        "🔌 **Connection Refused**\n\nThe service you're trying to connect to isn't running or is on a different port.\n\n**Fix:** Check if the service is running and verify the port number.",
+        "🔌 **Connection Refused**\n\nService එක run වෙන්නේ නැත්නම් port එක වෙනස්.\n\n**Fix:** Service run වෙනවද බලන්න, port check කරන්න."
+    ),
+    (
+        "permission denied",
+        "🔐 **Permission Denied**\n\nYou don't have permission to access this resource.\n\n**Fix:** Use `sudo` or check file permissions with `ls -la`.",
+        "🔐 **Permission Denied**\n\nFile/resource එකට access නැහැ.\n\n**Fix:** `sudo` use කරන්න හෝ permissions check කරන්න."
+    ),
+    (
+        "out of memory",
+        "💾 **Out of Memory**\n\nThe system ran out of RAM.\n\n**Fix:** Increase memory limits, optimize code, or add swap space.",
+        "💾 **Out of Memory**\n\nRAM මදි.\n\n**Fix:** Memory limits වැඩි කරන්න, code optimize කරන්න."
+    ),
+    (
+        "command not found",
+        "❓ **Command Not Found**\n\nThe command isn't installed or not in PATH.\n\n**Fix:** Install the package or add to PATH.",
+        "❓ **Command Not Found**\n\nCommand install වෙලා නැහැ හෝ PATH එකේ නැහැ.\n\n**Fix:** Package install කරන්න."
+    ),
+    (
+        "port already in use",
+        "🔒 **Port Already in Use**\n\nAnother process is using this port.\n\n**Fix:** Use `lsof -i :PORT` to find and kill the process.",
+        "🔒 **Port Already in Use**\n\nවෙන process එකක් port එක use කරනවා.\n\n**Fix:** `lsof -i :PORT` use කරලා process එක kill කරන්න."
+    ),
+    (
+        "timeout",
+        "⏱️ **Timeout Error**\n\nThe operation took too long.\n\n**Fix:** Check network connectivity, increase timeout, or optimize the operation.",
+        "⏱️ **Timeout Error**\n\nOperation එක වැඩි වෙලාවක් ගත්තා.\n\n**Fix:** Network check කරන්න, timeout වැඩි කරන්න."
+    ),
+    (
+        "file not found",
+        "📁 **File Not Found**\n\nThe specified file doesn't exist.\n\n**Fix:** Check the path, ensure file exists, check spelling.",
+        "📁 **File Not Found**\n\nFile එක නැහැ.\n\n**Fix:** Path එක check කරන්න, file තියෙනවද බලන්න."
+    ),
+    (
+        "syntax error",
+        "📝 **Syntax Error**\n\nThere's a syntax mistake in your code/config.\n\n**Fix:** Check line numbers, missing brackets, quotes, or colons.",
+        "📝 **Syntax Error**\n\nCode/config එකේ syntax වැරැද්දක්.\n\n**Fix:** Line numbers බලන්න, brackets/quotes check කරන්න."
+    )
+)
+# One group per pattern, so match.lastindex - 1 is its priority. The lookahead makes
+# every position a match, so overlapping patterns ("timeout of memory") are all seen.
+# ASCII-only case folding matches what the old error_log.lower() substring checks did.
+_FALLBACK_RE = re.compile(
+    "(?=" + "|".join(f"({re.escape(pattern)})" for pattern, _, _ in _FALLBACK_PATTERNS) + ")",
+    re.IGNORECASE | re.ASCII
+)
+
+# Answer when no pattern matches
+_GENERIC_EN = "🧠 **Error Analysis**\n\nCouldn't auto-detect the error pattern. Add an OpenAI API key for AI-powered analysis.\n\n**Tips:**\n• Read the error message carefully\n• Check line numbers mentioned\n• Search the error online"
+_GENERIC_SI = "🧠 **Error Analysis**\n\nමෙම error එක analyze කරන්න AI API key එකක් අවශ්‍යයි.\n\n**Tips:**\n• Error message එක හොඳින් කියවන්න\n• Line numbers check කරන්න\n• Google search කරන්න"
 
 
 def get_fallback_explanation(error_log: str, language: str = "en") -> str:
     """Fallback pattern-based error detection"""
-    error_lower = error_log.lower()
-    
-    patterns = {
-        "connection refused": {
-            "en": "🔌 **Connection Refused**\n\nThe service you're trying to connect to isn't running or is on a different port.\n\n**Fix:** Check if the service is running and verify the port number.",
-            "si": "🔌 **Connection Refused**\n\nService එක run වෙන්නේ නැත්නම් port එක වෙනස්.\n\n**Fix:** Service run වෙනවද බලන්න, port check කරන්න."
-        },
-        "permission denied": {
-            "en": "🔐 **Permission Denied**\n\nYou don't have permission to access this resource.\n\n**Fix:** Use `sudo` or check file permissions with `ls -la`.",
-            "si": "🔐 **Permission Denied**\n\nFile/resource එකට access නැහැ.\n\n**Fix:** `sudo` use කරන්න හෝ permissions check කරන්න."
-        },
-        "out of memory": {
-            "en": "💾 **Out of Memory**\n\nThe system ran out of RAM.\n\n**Fix:** Increase memory limits, optimize code, or add swap space.",
-            "si": "💾 **Out of Memory**\n\nRAM මදි.\n\n**Fix:** Memory limits වැඩි කරන්න, code optimize කරන්න."
-        },
-        "command not found": {
-            "en": "❓ **Command Not Found**\n\nThe command isn't installed or not in PATH.\n\n**Fix:** Install the package or add to PATH.",
-            "si": "❓ **Command Not Found**\n\nCommand install වෙලා නැහැ හෝ PATH එකේ නැහැ.\n\n**Fix:** Package install කරන්න."
-        },
-        "port already in use": {
-            "en": "🔒 **Port Already in Use**\n\nAnother process is using this port.\n\n**Fix:** Use `lsof -i :PORT` to find and kill the process.",
-            "si": "🔒 **Port Already in Use**\n\nවෙන process එකක් port එක use කරනවා.\n\n**Fix:** `lsof -i :PORT` use කරලා process එක kill කරන්න."
-        },
-        "timeout": {
-            "en": "⏱️ **Timeout Error**\n\nThe operation took too long.\n\n**Fix:** Check network connectivity, increase timeout, or optimize the operation.",
-            "si": "⏱️ **Timeout Error**\n\nOperation එක වැඩි වෙලාවක් ගත්තා.\n\n**Fix:** Network check කරන්න, timeout වැඩි කරන්න."
-        },
-        "file not found": {
-            "en": "📁 **File Not Found**\n\nThe specified file doesn't exist.\n\n**Fix:** Check the path, ensure file exists, check spelling.",
-            "si": "📁 **File Not Found**\n\nFile එක නැහැ.\n\n**Fix:** Path එක check කරන්න, file තියෙනවද බලන්න."
-        },
-        "syntax error": {
-            "en": "📝 **Syntax Error**\n\nThere's a syntax mistake in your code/config.\n\n**Fix:** Check line numbers, missing brackets, quotes, or colons.",
-            "si": "📝 **Syntax Error**\n\nCode/config එකේ syntax වැරැද්දක්.\n\n**Fix:** Line numbers බලන්න, brackets/quotes check කරන්න."
-        }
-    }
+    # One pass over the log; keep the highest-priority pattern that matched
+    best = None
+    for match in _FALLBACK_RE.finditer(error_log):
+        priority = match.lastindex - 1
+        if best is None or priority < best:
+            best = priority
+            if best == 0:
+                break
     
-    for pattern, explanations in patterns.items():
-        if pattern in error_lower:
-            return explanations.get(language, explanations["en"])
+    if best is not None:
+        _, en, si = _FALLBACK_PATTERNS[best]
+        return si if language == "si" else en
     
     # Generic response
-    if language == "si":
-        return "🧠 **Error Analysis**\n\nමෙම error එක analyze කරන්න AI API key එකක් අවශ්‍යයි.\n\n**Tips:**\n• Error message එක හොඳින් කියවන්න\n• Line numbers check කරන්න\n• Google search කරන්න"
-    
-    return "🧠 **Error Analysis**\n\nCouldn't auto-detect the error pattern. Add an OpenAI API key for AI-powered analysis.\n\n**Tips:**\n• Read the error message carefully\n• Check line numbers mentioned\n• Search the error online"
+    return _GENERIC_SI if language == "si" else _GENERIC_EN
 
 
-def get_ai_menu():
-    return """🧠 **AI Error Explainer**
+_AI_MENU = """🧠 **AI Error Explainer**
 
 Send me any error log and I'll explain:
 • 🔍 What went wrong
@@ -129,6 +346,10 @@ Error: EADDRINUSE: address already in use :3000
 💡 _Powered by AI - paste your error logs!_"""
 
 
+def get_ai_menu():
+    return _AI_MENU
+
+
 async def translate_to_sinhala(text: str) -> str:
     """Translate text to Sinhala using AI"""
     if not client:
@@ -3,8 +3,13 @@
 Parses and visualizes GitHub Actions workflows
 """
 
+import copy
+import functools
+
 import yaml
 
+from app.modules.yaml_validator import MAX_CACHED_YAML_SIZE, describe_yaml_error, load_yaml
+
 SAMPLE_WORKFLOWS = {
     "nodejs": """name: Node.js CI/CD
 on:
@@ -45,35 +50,56 @@ jobs:
 }
 
 
-def parse_workflow(content: str) -> dict:
-    """Parse GitHub Actions workflow YAML"""
+def _parse_workflow_tuple(content: str) -> tuple:
+    """Parse workflow YAML into an immutable tuple"""
     try:
-        workflow = yaml.safe_load(content)
-        
-        if not workflow or "jobs" not in workflow:
-            return {"success": False, "error": "Invalid workflow: No jobs found"}
-        
-        jobs = []
-        for name, config in workflow.get("jobs", {}).items():
-            needs = config.get("needs", [])
-            if isinstance(needs, str):
-                needs = [needs]
-            
-            jobs.append({
-                "name": name,
-                "runs_on": config.get("runs-on", "ubuntu-latest"),
-                "needs": needs,
-                "steps": len(config.get("steps", []))
-            })
-        
-        return {
-            "success": True,
-            "name": workflow.get("name", "Workflow"),
-            "trigger": workflow.get("on", {}),
-            "jobs": jobs
-        }
+        workflow = load_yaml(content)
     except yaml.YAMLError as e:
-        return {"success": False, "error": f"YAML error: {str(e)}"}
+        return (False, f"YAML error: {describe_yaml_error(content, e)}")
+    
+    if not workflow or "jobs" not in workflow:
+        return (False, "Invalid workflow: No jobs found")
+    
+    jobs = []
+    for name, config in workflow.get("jobs", {}).items():
+        needs = config.get("needs", [])
+        if isinstance(needs, str):
+            needs = [needs]
+        
+        jobs.append((
+            name,
+            config.get("runs-on", "ubuntu-latest"),
+            tuple(needs),
+            len(config.get("steps", []))
+        ))
+    
+    return (True, workflow.get("name", "Workflow"), workflow.get("on", {}), tuple(jobs))
+
+
+# Memoized per input string; parse_workflow only uses it for inputs up to MAX_CACHED_YAML_SIZE
+_parse_workflow_cached = functools.lru_cache(maxsize=512)(_parse_workflow_tuple)
+
+
+def parse_workflow(content: str) -> dict:
+    """Parse GitHub Actions workflow YAML"""
+    if len(content) <= MAX_CACHED_YAML_SIZE:
+        parsed = _parse_workflow_cached(content)
+    else:
+        parsed = _parse_workflow_tuple(content)
+    if not parsed[0]:
+        return {"success": False, "error": parsed[1]}
+    
+    _, name, trigger, jobs = parsed
+    return {
+        "success": True,
+        "name": name,
+        # The cached trigger is shared between calls, so hand out a copy
+        "trigger": copy.deepcopy(trigger),
+        "jobs": [
+            {"name": job_name, "runs_on": runs_on, "needs": list(needs), "steps": steps}
+            for job_name, runs_on, needs, steps in jobs
+        ]
+    }
 
 
 def visualize_pipeline(workflow: dict) -> str:
@@ -81,28 +107,33 @@ def visualize_pipeline(workflow: dict) -> str:
     if not workflow.get("success"):
         return f"❌ {workflow.get('error')}"
     
-    output = f"🧪 **{workflow['name']}**\n\n```\n"
-    output += "┌─────────────────────────────┐\n"
-    output += "│      CI/CD PIPELINE         │\n"
-    output += "└─────────────────────────────┘\n"
+    parts = [
+        f"🧪 **{workflow['name']}**\n\n```\n",
+        "┌─────────────────────────────┐\n",
+        "│      CI/CD PIPELINE         │\n",
+        "└─────────────────────────────┘\n",
+    ]
     
     # Sort jobs by dependencies
     sorted_jobs = topological_sort(workflow["jobs"])
+    job_map = {j["name"]: j for j in workflow["jobs"]}
     
     for job_name in sorted_jobs:
-        job = next(j for j in workflow["jobs"] if j["name"] == job_name)
-        output += "            │\n            ▼\n"
-        output += f"    ┌─────────────────────┐\n"
-        output += f"    │ 📦 {job['name'][:17]:17}│\n"
-        output += f"    │   {job['steps']} steps{' ' * 10}│\n"
-        output += f"    └─────────────────────┘\n"
+        job = job_map.get(job_name)
+        if job is None:
+            continue
+        parts.append("            │\n            ▼\n")
+        parts.append("    ┌─────────────────────┐\n")
+        parts.append(f"    │ 📦 {job['name'][:17]:17}│\n")
+        parts.append(f"    │   {job['steps']} steps{' ' * 10}│\n")
+        parts.append("    └─────────────────────┘\n")
     
-    output += "            │\n            ▼\n"
-    output += "    ┌─────────────────────┐\n"
-    output += "    │    ✅ COMPLETE      │\n"
-    output += "    └─────────────────────┘\n```"
+    parts.append("            │\n            ▼\n")
+    parts.append("    ┌─────────────────────┐\n")
+    parts.append("    │    ✅ COMPLETE      │\n")
+    parts.append("    └─────────────────────┘\n```")
     
-    return output
+    return "".join(parts)
 
 
 def explain_workflow(workflow: dict, lang: str = "en") -> str:
@@ -111,24 +142,23 @@ def explain_workflow(workflow: dict, lang: str = "en") -> str:
         return f"❌ {workflow.get('error')}"
     
     title = "📖 **Workflow පැහැදිලි කිරීම**" if lang == "si" else "📖 **Workflow Explanation**"
-    output = f"{title}\n\n"
+    parts = [f"{title}\n\n"]
     
     # Triggers
     triggers = workflow.get("trigger", {})
     if isinstance(triggers, dict):
-        trigger_list = list(triggers.keys())
-        output += f"**Triggers:** {', '.join(trigger_list)}\n\n"
+        parts.append(f"**Triggers:** {', '.join(triggers.keys())}\n\n")
     
     # Jobs
-    output += "**Jobs:**\n\n"
+    parts.append("**Jobs:**\n\n")
     for job in workflow["jobs"]:
-        output += f"**{job['name']}**\n"
-        output += f"• Runs on: `{job['runs_on']}`\n"
+        parts.append(f"**{job['name']}**\n")
+        parts.append(f"• Runs on: `{job['runs_on']}`\n")
         if job["needs"]:
-            output += f"• Depends on: {', '.join(job['needs'])}\n"
-        output += f"• Steps: {job['steps']}\n\n"
+            parts.append(f"• Depends on: {', '.join(job['needs'])}\n")
+        parts.append(f"• Steps: {job['steps']}\n\n")
     
-    return output
+    return "".join(parts)
 
 
 def topological_sort(jobs: list) -> list:
@@ -136,33 +166,46 @@ def topological_sort(jobs: list) -> list:
     result = []
     visited = set()
     job_map = {j["name"]: j for j in jobs}
-    
-    def visit(name):
-        if name in visited:
-            return
-        visited.add(name)
-        job = job_map.get(name)
-        if job:
-            for dep in job.get("needs", []):
-                visit(dep)
-        result.append(name)
+    done = object()
     
     for job in jobs:
-        visit(job["name"])
+        if job["name"] in visited:
+            continue
+        visited.add(job["name"])
+        
+        # Iterative DFS so deep dependency chains can't hit the recursion limit
+        stack = [(job["name"], iter(job.get("needs", [])))]
+        while stack:
+            name, deps = stack[-1]
+            dep = next(deps, done)
+            if dep is done:
+                result.append(name)
+                stack.pop()
+            elif dep not in visited:
+                visited.add(dep)
+                dep_job = job_map.get(dep)
+                stack.append((dep, iter(dep_job.get("needs", []) if dep_job else ())))
     
     return result
 
 
+# Samples are static, so parse them once at import
+_PARSED_SAMPLES = {k: parse_workflow(v) for k, v in SAMPLE_WORKFLOWS.items()}
+_SAMPLES = {
+    k: {"yaml": v, "type": k, "workflow": _PARSED_SAMPLES[k]} for k, v in SAMPLE_WORKFLOWS.items()
+}
+
+# Never mutate the samples: main._STATIC_JSON keys their pre-encoded JSON on id()
+STATIC_RESPONSES = tuple(_SAMPLES.values())
+
+
 def get_sample(name: str) -> dict:
     """Get sample workflow"""
     key = name.lower().replace("sample ", "").strip()
-    if key in SAMPLE_WORKFLOWS:
-        return {"yaml": SAMPLE_WORKFLOWS[key], "type": key}
-    return None
+    return _SAMPLES.get(key)
 
 
-def get_cicd_menu():
-    return """🧪 **CI/CD Pipeline Visualizer**
+_CICD_MENU = """🧪 **CI/CD Pipeline Visualizer**
 
 Send GitHub Actions YAML or try:
 • `sample nodejs` - Node.js CI/CD
@@ -172,3 +215,7 @@ Send GitHub Actions YAML or try:
 • 📊 Visual pipeline diagram
 • 📖 Step-by-step explanation
 • 🔍 Syntax validation"""
+
+
+def get_cicd_menu():
+    return _CICD_MENU
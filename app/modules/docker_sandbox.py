@@ -3,11 +3,25 @@
 Simulates Docker commands safely for learning
 """
 
-import random
-import string
+import os
+from collections import OrderedDict
 
-# Simulated state
-containers = []
+# Limits on simulated state
+MAX_CONTAINERS = 100
+MAX_SANDBOXES = 10000
+
+
+class Sandbox:
+    """Simulated Docker state for one user"""
+
+    def __init__(self):
+        # container id -> container, oldest first
+        self.containers = OrderedDict()
+        self.name_to_id = {}
+
+
+# user id -> Sandbox, least recently used first
+sandboxes = OrderedDict()
 images = [
     {"repository": "nginx", "tag": "latest", "id": "a1b2c3d4e5f6", "size": "142MB"},
     {"repository": "mysql", "tag": "8.0", "id": "b2c3d4e5f6a1", "size": "544MB"},
@@ -40,11 +54,157 @@ EXPLANATIONS = {
 }
 
 
+# The image list is static, so render `docker images` once
+_IMAGES_OUTPUT = "\n".join(
+    ["```\nREPOSITORY    TAG          IMAGE ID       SIZE"]
+    + [f"{img['repository']:13} {img['tag']:12} {img['id']}   {img['size']}" for img in images]
+    + ["```"]
+)
+
+
+# Static responses, built once and returned as-is
+_IMAGES_RESPONSE = {"success": True, "output": _IMAGES_OUTPUT, "explanation": EXPLANATIONS.get("images")}
+
+_LOGS_RESPONSE = {
+    "success": True,
+    "output": "📜 Logs:\n```\n2024-01-22 10:00:01 [INFO] Started\n2024-01-22 10:00:02 [INFO] Listening on :3000\n```",
+    "explanation": None
+}
+
+_EXEC_RESPONSE = {
+    "success": True,
+    "output": "🔧 Exec:\n```\nroot@container:/# ls\napp bin etc home lib\nroot@container:/# exit\n```",
+    "explanation": None
+}
+
+_HELP_RESPONSE = {
+    "success": True,
+    "output": """📚 **Docker Commands**
+
+• `docker run <image>` - Run container
+• `docker ps` - List containers
+• `docker images` - List images
+• `docker build -t name .` - Build image
+• `docker stop <id>` - Stop container
+• `docker logs <id>` - View logs
+• `docker exec -it <id> bash` - Enter container""",
+    "explanation": None
+}
+
+# Never mutate these: main._STATIC_JSON serves them as bytes encoded at import, keyed on id()
+STATIC_RESPONSES = (_IMAGES_RESPONSE, _LOGS_RESPONSE, _EXEC_RESPONSE, _HELP_RESPONSE)
+
+
+def get_sandbox(user_id: str) -> Sandbox:
+    """Get (or create) a user's sandbox, evicting the least recently used one"""
+    sandbox = sandboxes.get(user_id)
+    if sandbox is None:
+        sandbox = sandboxes[user_id] = Sandbox()
+        if len(sandboxes) > MAX_SANDBOXES:
+            sandboxes.popitem(last=False)
+    else:
+        sandboxes.move_to_end(user_id)
+    return sandbox
+
+
 def generate_id():
-    return ''.join(random.choices(string.hexdigits.lower(), k=12))
+    return os.urandom(6).hex()
+
 
+def _handle_run(parts: list, sandbox: Sandbox) -> dict:
+    image = parts[-1] if len(parts) > 2 else "nginx"
+    container_id = generate_id()
+    name = f"{image.split(':')[0]}_{container_id[:4]}"
+    containers = sandbox.containers
+    containers[container_id] = {
+        "id": container_id,
+        "image": image,
+        "status": "Up 2 seconds",
+        "name": name
+    }
+    sandbox.name_to_id[name] = container_id
+    if len(containers) > MAX_CONTAINERS:
+        old_id, old = containers.popitem(last=False)
+        if sandbox.name_to_id.get(old["name"]) == old_id:
+            del sandbox.name_to_id[old["name"]]
+    return {
+        "success": True,
+        "output": f"✅ Container started!\n```\n{container_id}\n```",
+        "explanation": EXPLANATIONS.get("run")
+    }
+
+
+def _handle_ps(parts: list, sandbox: Sandbox) -> dict:
+    containers = sandbox.containers
+    if not containers:
+        output = "```\nCONTAINER ID   IMAGE   STATUS   NAMES\n```\n_No containers_"
+    else:
+        lines = ["```\nCONTAINER ID   IMAGE          STATUS          NAMES"]
+        lines.extend(
+            f"{c['id'][:12]}   {c['image']:14} {c['status']:15} {c['name']}" for c in containers.values()
+        )
+        lines.append("```")
+        output = "\n".join(lines)
+    return {"success": True, "output": output, "explanation": EXPLANATIONS.get("ps")}
+
+
+def _handle_images(parts: list, sandbox: Sandbox) -> dict:
+    return _IMAGES_RESPONSE
+
+
+def _handle_build(parts: list, sandbox: Sandbox) -> dict:
+    return {
+        "success": True,
+        "output": f"🔨 Building...\n```\nStep 1/5 : FROM node:18-alpine\nStep 2/5 : WORKDIR /app\nStep 3/5 : COPY . .\nStep 4/5 : RUN npm install\nStep 5/5 : CMD [\"npm\", \"start\"]\nSuccessfully built {generate_id()}\n```",
+        "explanation": EXPLANATIONS.get("build")
+    }
 
-def simulate_docker(command: str) -> dict:
+
+def _handle_stop(parts: list, sandbox: Sandbox) -> dict:
+    containers = sandbox.containers
+    if len(parts) > 2 and containers:
+        target = parts[2]
+        container_id = sandbox.name_to_id.get(target)
+        if container_id is None:
+            container_id = next((cid for cid in containers if cid.startswith(target)), None)
+        if container_id is not None:
+            c = containers[container_id]
+            c["status"] = "Exited (0)"
+            return {"success": True, "output": f"🛑 Stopped {c['name']}", "explanation": EXPLANATIONS.get("stop")}
+    return {"success": False, "output": "❌ Container not found", "explanation": EXPLANATIONS.get("stop")}
+
+
+def _handle_logs(parts: list, sandbox: Sandbox) -> dict:
+    return _LOGS_RESPONSE
+
+
+def _handle_exec(parts: list, sandbox: Sandbox) -> dict:
+    return _EXEC_RESPONSE
+
+
+def _handle_help(parts: list, sandbox: Sandbox) -> dict:
+    return _HELP_RESPONSE
+
+
+def _handle_unknown(parts: list, sandbox: Sandbox) -> dict:
+    return {"success": False, "output": f"❓ Unknown: docker {parts[1]}", "explanation": None}
+
+
+# Subcommand -> handler(parts, sandbox)
+_DOCKER_HANDLERS = {
+    "run": _handle_run,
+    "ps": _handle_ps,
+    "images": _handle_images,
+    "build": _handle_build,
+    "stop": _handle_stop,
+    "logs": _handle_logs,
+    "exec": _handle_exec,
+    "help": _handle_help,
+    "--help": _handle_help,
+}
+
+
+def simulate_docker(command: str, user_id: str = "default") -> dict:
     """Simulate Docker command and return output with explanation"""
     parts = command.strip().split()
     
@@ -54,90 +214,10 @@ def simulate_docker(command: str) -> dict:
     if len(parts) < 2:
         return {"success": False, "output": "❌ Missing subcommand", "explanation": None}
     
-    subcmd = parts[1]
-    
-    if subcmd == "run":
-        image = parts[-1] if len(parts) > 2 else "nginx"
-        container_id = generate_id()
-        containers.append({
-            "id": container_id,
-            "image": image,
-            "status": "Up 2 seconds",
-            "name": f"{image.split(':')[0]}_{container_id[:4]}"
-        })
-        return {
-            "success": True,
-            "output": f"✅ Container started!\n```\n{container_id}\n```",
-            "explanation": EXPLANATIONS.get("run")
-        }
-    
-    elif subcmd == "ps":
-        if not containers:
-            output = "```\nCONTAINER ID   IMAGE   STATUS   NAMES\n```\n_No containers_"
-        else:
-            output = "```\nCONTAINER ID   IMAGE          STATUS          NAMES\n"
-            for c in containers:
-                output += f"{c['id'][:12]}   {c['image']:14} {c['status']:15} {c['name']}\n"
-            output += "```"
-        return {"success": True, "output": output, "explanation": EXPLANATIONS.get("ps")}
-    
-    elif subcmd == "images":
-        output = "```\nREPOSITORY    TAG          IMAGE ID       SIZE\n"
-        for img in images:
-            output += f"{img['repository']:13} {img['tag']:12} {img['id']}   {img['size']}\n"
-        output += "```"
-        return {"success": True, "output": output, "explanation": EXPLANATIONS.get("images")}
-    
-    elif subcmd == "build":
-        return {
-            "success": True,
-            "output": f"🔨 Building...\n```\nStep 1/5 : FROM node:18-alpine\nStep 2/5 : WORKDIR /app\nStep 3/5 : COPY . .\nStep 4/5 : RUN npm install\nStep 5/5 : CMD [\"npm\", \"start\"]\nSuccessfully built {generate_id()}\n```",
-            "explanation": EXPLANATIONS.get("build")
-        }
-    
-    elif subcmd == "stop":
-        if len(parts) > 2 and containers:
-            target = parts[2]
-            for c in containers:
-                if c["id"].startswith(target) or c["name"] == target:
-                    c["status"] = "Exited (0)"
-                    return {"success": True, "output": f"🛑 Stopped {c['name']}", "explanation": EXPLANATIONS.get("stop")}
-        return {"success": False, "output": "❌ Container not found", "explanation": EXPLANATIONS.get("stop")}
-    
-    elif subcmd == "logs":
-        return {
-            "success": True,
-            "output": "📜 Logs:\n```\n2024-01-22 10:00:01 [INFO] Started\n2024-01-22 10:00:02 [INFO] Listening on :3000\n```",
-            "explanation": None
-        }
-    
-    elif subcmd == "exec":
-        return {
-            "success": True,
-            "output": "🔧 Exec:\n```\nroot@container:/# ls\napp bin etc home lib\nroot@container:/# exit\n```",
-            "explanation": None
-        }
-    
-    elif subcmd in ("help", "--help"):
-        return {
-            "success": True,
-            "output": """📚 **Docker Commands**
-
-• `docker run <image>` - Run container
-• `docker ps` - List containers
-• `docker images` - List images
-• `docker build -t name .` - Build image
-• `docker stop <id>` - Stop container
-• `docker logs <id>` - View logs
-• `docker exec -it <id> bash` - Enter container""",
-            "explanation": None
-        }
-    
-    return {"success": False, "output": f"❓ Unknown: docker {subcmd}", "explanation": None}
+    return _DOCKER_HANDLERS.get(parts[1], _handle_unknown)(parts, get_sandbox(user_id))
 
 
-def get_docker_menu():
-    return """🐳 **Docker Sandbox**
+_DOCKER_MENU = """🐳 **Docker Sandbox**
 
 Practice Docker commands safely!
 
@@ -151,6 +231,13 @@ Practice Docker commands safely!
 💡 _All commands are simulated!_"""
 
 
-def reset():
-    global containers
-    containers = []
+def get_docker_menu():
+    return _DOCKER_MENU
+
+
+def reset(user_id: str = None):
+    """Reset one user's sandbox, or all of them"""
+    if user_id is None:
+        sandboxes.clear()
+    else:
+        sandboxes.pop(user_id, None)
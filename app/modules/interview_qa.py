@@ -181,8 +181,7 @@ def get_random_question(category: str = None, lang: str = "en") -> dict:
     }
 
 
-def get_interview_menu():
-    return """📝 **DevOps Interview Q&A**
+_INTERVIEW_MENU = """📝 **DevOps Interview Q&A**
 
 **Categories:**
 • `/quiz docker` - Docker questions
@@ -200,5 +199,9 @@ def get_interview_menu():
 💡 _50+ curated interview questions!_"""
 
 
+def get_interview_menu():
+    return _INTERVIEW_MENU
+
+
 def get_categories():
     return list(QUESTIONS.keys())
@@ -3,6 +3,10 @@
 Simulates kubectl commands and teaches K8s concepts
 """
 
+import functools
+import sys
+from typing import Optional
+
 # Simulated resources
 PODS = [
     {"name": "nginx-7c79c4bf97-x8k2j", "ready": "1/1", "status": "Running", "age": "2d"},
@@ -91,57 +95,55 @@ Types:
     }
 }
 
+# Lowercase concept name or kubectl alias -> concept
+_CONCEPT_ALIASES = {
+    "pod": ("pods", "po"),
+    "deployment": ("deployments", "deploy"),
+    "service": ("services", "svc"),
+    "configmap": ("configmaps", "cm"),
+    "secret": ("secrets",),
+}
+_CONCEPTS_INDEX = {sys.intern(name.lower()): concept for name, concept in CONCEPTS.items()}
+_CONCEPTS_INDEX.update(
+    (sys.intern(alias), CONCEPTS[name]) for name, aliases in _CONCEPT_ALIASES.items() for alias in aliases
+)
 
-def simulate_kubectl(command: str) -> dict:
-    """Simulate kubectl command"""
-    parts = command.strip().split()
-    
-    if not parts or parts[0] != "kubectl":
-        return {"success": False, "output": "❌ Command must start with 'kubectl'", "explanation": None}
-    
-    if len(parts) < 2:
-        return {"success": False, "output": "❌ Missing action", "explanation": None}
-    
-    action = parts[1]
-    
-    if action == "get":
-        if len(parts) < 3:
-            return {"success": False, "output": "❌ Specify resource type", "explanation": None}
-        
-        resource = parts[2]
-        
-        if resource in ("pods", "pod", "po"):
-            output = "```\nNAME                        READY   STATUS    AGE\n"
-            for p in PODS:
-                output += f"{p['name']:27} {p['ready']}     {p['status']:9} {p['age']}\n"
-            output += "```"
-            return {"success": True, "output": output, "explanation": CONCEPTS.get("pod")}
-        
-        elif resource in ("deployments", "deployment", "deploy"):
-            output = "```\nNAME          READY   AVAILABLE   AGE\n"
-            for d in DEPLOYMENTS:
-                output += f"{d['name']:13} {d['ready']}     {d['available']}           {d['age']}\n"
-            output += "```"
-            return {"success": True, "output": output, "explanation": CONCEPTS.get("deployment")}
-        
-        elif resource in ("services", "service", "svc"):
-            output = "```\nNAME         TYPE           CLUSTER-IP     PORT(S)\n"
-            for s in SERVICES:
-                output += f"{s['name']:12} {s['type']:14} {s['cluster_ip']:14} {s['port']}\n"
-            output += "```"
-            return {"success": True, "output": output, "explanation": CONCEPTS.get("service")}
-        
-        elif resource in ("nodes", "node"):
-            return {
-                "success": True,
-                "output": "```\nNAME     STATUS   ROLES           VERSION\nnode-1   Ready    control-plane   v1.28.0\nnode-2   Ready    worker          v1.28.0\n```",
-                "explanation": None
-            }
-    
-    elif action == "describe":
-        return {
-            "success": True,
-            "output": """📋 **Pod Description**
+
+# `kubectl get` output never changes, so render the tables once
+_PODS_OUTPUT = "\n".join(
+    ["```\nNAME                        READY   STATUS    AGE"]
+    + [f"{p['name']:27} {p['ready']}     {p['status']:9} {p['age']}" for p in PODS]
+    + ["```"]
+)
+_DEPLOYMENTS_OUTPUT = "\n".join(
+    ["```\nNAME          READY   AVAILABLE   AGE"]
+    + [f"{d['name']:13} {d['ready']}     {d['available']}           {d['age']}" for d in DEPLOYMENTS]
+    + ["```"]
+)
+_SERVICES_OUTPUT = "\n".join(
+    ["```\nNAME         TYPE           CLUSTER-IP     PORT(S)"]
+    + [f"{s['name']:12} {s['type']:14} {s['cluster_ip']:14} {s['port']}" for s in SERVICES]
+    + ["```"]
+)
+_NODES_OUTPUT = "```\nNAME     STATUS   ROLES           VERSION\nnode-1   Ready    control-plane   v1.28.0\nnode-2   Ready    worker          v1.28.0\n```"
+
+# Resource name or alias -> static `kubectl get` response
+_GET_TABLE = {
+    alias: {"success": True, "output": output, "explanation": explanation}
+    for aliases, output, explanation in (
+        (("pods", "pod", "po"), _PODS_OUTPUT, CONCEPTS.get("pod")),
+        (("deployments", "deployment", "deploy"), _DEPLOYMENTS_OUTPUT, CONCEPTS.get("deployment")),
+        (("services", "service", "svc"), _SERVICES_OUTPUT, CONCEPTS.get("service")),
+        (("nodes", "node"), _NODES_OUTPUT, None),
+    )
+    for alias in aliases
+}
+
+
+# Static kubectl responses, built once and returned as-is
+_DESCRIBE_RESPONSE = {
+    "success": True,
+    "output": """📋 **Pod Description**
 ```
 Name:         nginx-7c79c4bf97-x8k2j
 Namespace:    default
@@ -156,41 +158,30 @@ Events:
   Normal  Scheduled  Successfully assigned
   Normal  Started    Container started
 ```""",
-            "explanation": CONCEPTS.get("pod")
-        }
-    
-    elif action == "apply":
-        return {
-            "success": True,
-            "output": "✅ `kubectl apply` - Configuration applied!\n```\ndeployment.apps/nginx configured\nservice/nginx-svc unchanged\n```",
-            "explanation": None
-        }
-    
-    elif action == "delete":
-        return {
-            "success": True,
-            "output": f"🗑️ Deleting resource...\n```\n{parts[2] if len(parts) > 2 else 'resource'} deleted\n```",
-            "explanation": None
-        }
-    
-    elif action == "logs":
-        return {
-            "success": True,
-            "output": "📜 **Pod Logs:**\n```\n2024-01-22 10:00:01 nginx started\n2024-01-22 10:00:02 listening on port 80\n```",
-            "explanation": None
-        }
-    
-    elif action == "scale":
-        return {
-            "success": True,
-            "output": "📈 Scaling deployment...\n```\ndeployment.apps/nginx scaled\n```",
-            "explanation": CONCEPTS.get("deployment")
-        }
-    
-    elif action in ("help", "--help"):
-        return {
-            "success": True,
-            "output": """📚 **kubectl Commands**
+    "explanation": CONCEPTS.get("pod")
+}
+
+_APPLY_RESPONSE = {
+    "success": True,
+    "output": "✅ `kubectl apply` - Configuration applied!\n```\ndeployment.apps/nginx configured\nservice/nginx-svc unchanged\n```",
+    "explanation": None
+}
+
+_LOGS_RESPONSE = {
+    "success": True,
+    "output": "📜 **Pod Logs:**\n```\n2024-01-22 10:00:01 nginx started\n2024-01-22 10:00:02 listening on port 80\n```",
+    "explanation": None
+}
+
+_SCALE_RESPONSE = {
+    "success": True,
+    "output": "📈 Scaling deployment...\n```\ndeployment.apps/nginx scaled\n```",
+    "explanation": CONCEPTS.get("deployment")
+}
+
+_HELP_RESPONSE = {
+    "success": True,
+    "output": """📚 **kubectl Commands**
 
 • `kubectl get pods` - List pods
 • `kubectl get deployments` - List deployments
@@ -200,22 +191,89 @@ Events:
 • `kubectl delete <type> <name>` - Delete resource
 • `kubectl logs <pod>` - View logs
 • `kubectl scale deploy <name> --replicas=3`""",
-            "explanation": None
-        }
+    "explanation": None
+}
+
+
+# Never mutate these (get tables included): main._STATIC_JSON keys their pre-encoded JSON on id()
+STATIC_RESPONSES = (
+    _DESCRIBE_RESPONSE, _APPLY_RESPONSE, _LOGS_RESPONSE, _SCALE_RESPONSE, _HELP_RESPONSE,
+    *_GET_TABLE.values()
+)
+
+
+def _unknown_response(parts: list) -> dict:
+    return {"success": False, "output": f"❓ Unknown: kubectl {parts[1]}", "explanation": None}
+
+
+def _get_response(parts: list) -> dict:
+    if len(parts) < 3:
+        return {"success": False, "output": "❌ Specify resource type", "explanation": None}
     
-    return {"success": False, "output": f"❓ Unknown: kubectl {action}", "explanation": None}
+    response = _GET_TABLE.get(parts[2])
+    if response:
+        return response
+    return _unknown_response(parts)
 
 
-def get_concept(name: str, lang: str = "en") -> str:
+def _delete_response(parts: list) -> dict:
+    return {
+        "success": True,
+        "output": f"🗑️ Deleting resource...\n```\n{parts[2] if len(parts) > 2 else 'resource'} deleted\n```",
+        "explanation": None
+    }
+
+
+# Action -> static response dict, or handler(parts) for actions that depend on arguments
+_ACTION_HANDLERS: dict = {
+    "get": _get_response,
+    "describe": _DESCRIBE_RESPONSE,
+    "apply": _APPLY_RESPONSE,
+    "delete": _delete_response,
+    "logs": _LOGS_RESPONSE,
+    "scale": _SCALE_RESPONSE,
+    "help": _HELP_RESPONSE,
+    "--help": _HELP_RESPONSE,
+}
+
+
+def simulate_kubectl(command: str) -> dict:
+    """Simulate kubectl command"""
+    command = command.strip()
+    # Reject other input before it can take up a cache slot
+    if not command.startswith("kubectl"):
+        return {"success": False, "output": "❌ Command must start with 'kubectl'", "explanation": None}
+    return _simulate_kubectl_cached(command)
+
+
+@functools.lru_cache(maxsize=512)
+def _simulate_kubectl_cached(command: str) -> dict:
+    # Output depends only on the command, so results are memoized and shared;
+    # callers must treat them as read-only
+    # Only the first three tokens are ever read, so don't split the rest
+    parts = command.split(None, 3)
+    
+    if parts[0] != "kubectl":
+        return {"success": False, "output": "❌ Command must start with 'kubectl'", "explanation": None}
+    
+    if len(parts) < 2:
+        return {"success": False, "output": "❌ Missing action", "explanation": None}
+    
+    handler = _ACTION_HANDLERS.get(parts[1])
+    if handler is None:
+        return _unknown_response(parts)
+    return handler(parts) if callable(handler) else handler
+
+
+def get_concept(name: str, lang: str = "en") -> Optional[str]:
     """Get K8s concept explanation"""
-    concept = CONCEPTS.get(name.lower())
-    if concept:
-        return concept.get(lang, concept.get("en"))
-    return None
+    concept = _CONCEPTS_INDEX.get(name.lower())
+    if concept is None:
+        return None
+    return concept.get(lang) or concept["en"]
 
 
-def get_kubernetes_menu():
-    return """☸️ **Kubernetes Learning Center**
+_K8S_MENU = """☸️ **Kubernetes Learning Center**
 
 **Commands:**
 • `kubectl get pods`
@@ -232,3 +290,7 @@ def get_kubernetes_menu():
 • /secret - Secrets
 
 💡 _Commands are simulated!_"""
+
+
+def get_kubernetes_menu() -> str:
+    return _K8S_MENU
@@ -3,87 +3,131 @@
 Validates YAML syntax and explains structure
 """
 
+import copy
+import functools
+from itertools import islice
+
+import orjson
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader  # type: ignore[assignment]
 
-def validate_yaml(content: str) -> dict:
-    """Validate YAML content and return result with explanation"""
+
+def load_yaml(content: str):
+    """Parse YAML with the fastest available safe loader; raises yaml.YAMLError"""
+    return yaml.load(content, Loader=SafeLoader)
+
+
+def describe_yaml_error(content: str, error: yaml.YAMLError) -> str:
+    """User-facing message for invalid YAML, with the source line and caret"""
+    # libyaml's errors only give a line/column, so re-parse on this (rare) path for a better message
     try:
-        parsed = yaml.safe_load(content)
-        
-        if parsed is None:
-            return {
-                "valid": True,
-                "output": "✅ Valid YAML (empty document)",
-                "parsed": None,
-                "explanation": None
-            }
-        
-        # Detect YAML type and provide explanation
-        explanation = analyze_yaml_structure(parsed)
-        
-        return {
-            "valid": True,
-            "output": "✅ **Valid YAML!**",
-            "parsed": parsed,
-            "explanation": explanation
-        }
-        
+        yaml.load(content, Loader=yaml.SafeLoader)
     except yaml.YAMLError as e:
-        error_msg = str(e)
+        return str(e)
+    return str(error)
+
+
+# Larger inputs (only possible via the web API) are parsed without being kept in a cache
+MAX_CACHED_YAML_SIZE = 64 * 1024
+
+
+def _parse(content: str) -> tuple:
+    """Parse and explain YAML: (True, parsed, explanation) or (False, error)"""
+    try:
+        parsed = load_yaml(content)
+    except yaml.YAMLError as e:
+        return (False, describe_yaml_error(content, e))
+    
+    if parsed is None:
+        return (True, None, None)
+    
+    # Detect YAML type and provide explanation
+    return (True, parsed, analyze_yaml_structure(parsed))
+
+
+_parse_cached = functools.lru_cache(maxsize=256)(_parse)
+
+
+def validate_yaml(content: str) -> dict:
+    """Validate YAML content and return result with explanation"""
+    result = _parse_cached(content) if len(content) <= MAX_CACHED_YAML_SIZE else _parse(content)
+    
+    if not result[0]:
         return {
             "valid": False,
-            "output": f"❌ **Invalid YAML**\n\n```\n{error_msg}\n```",
+            "output": f"❌ **Invalid YAML**\n\n```\n{result[1]}\n```",
             "parsed": None,
             "explanation": get_common_errors()
         }
+    
+    _, parsed, explanation = result
+    if parsed is None:
+        return {
+            "valid": True,
+            "output": "✅ Valid YAML (empty document)",
+            "parsed": None,
+            "explanation": None
+        }
+    
+    return {
+        "valid": True,
+        "output": "✅ **Valid YAML!**",
+        # The cached document is shared between calls, so hand out a copy
+        "parsed": copy.deepcopy(parsed),
+        "explanation": explanation
+    }
 
 
-def analyze_yaml_structure(parsed: dict) -> str:
-    """Analyze YAML structure and provide explanation"""
-    if not isinstance(parsed, dict):
-        return f"📊 This YAML contains a {type(parsed).__name__}"
-    
-    # Check for Kubernetes manifest
-    if "apiVersion" in parsed and "kind" in parsed:
-        kind = parsed.get("kind", "Unknown")
-        return f"""📊 **Kubernetes {kind} Manifest**
+# Top-level keys that identify each file type
+_K8S_KEYS = frozenset({"apiVersion", "kind"})
+_GHA_KEYS = frozenset({"on", "jobs"})
+_COMPOSE_KEYS = frozenset({"services", "version"})
+
+
+@functools.lru_cache(maxsize=256)
+def _k8s_explanation(kind: str, api_version: str) -> str:
+    return f"""📊 **Kubernetes {kind} Manifest**
 
 **Structure:**
-• `apiVersion`: {parsed.get('apiVersion')} - API version
+• `apiVersion`: {api_version} - API version
 • `kind`: {kind} - Resource type
 • `metadata`: Resource metadata (name, labels)
 • `spec`: Desired state configuration
 
 💡 Use `kubectl apply -f file.yaml` to deploy"""
-    
-    # Check for GitHub Actions
-    if "name" in parsed and ("on" in parsed or "jobs" in parsed):
-        jobs = list(parsed.get("jobs", {}).keys())
-        return f"""📊 **GitHub Actions Workflow**
+
+
+@functools.lru_cache(maxsize=256)
+def _gha_explanation(count: int, first_jobs: tuple) -> str:
+    return f"""📊 **GitHub Actions Workflow**
 
 **Structure:**
 • `name`: Workflow name
 • `on`: Trigger events
-• `jobs`: {len(jobs)} job(s) - {', '.join(jobs[:3])}
+• `jobs`: {count} job(s) - {', '.join(first_jobs)}
 
 💡 Place in `.github/workflows/`"""
-    
-    # Check for Docker Compose
-    if "services" in parsed or "version" in parsed:
-        services = list(parsed.get("services", {}).keys())
-        return f"""📊 **Docker Compose File**
+
+
+@functools.lru_cache(maxsize=256)
+def _compose_explanation(count: int, first_services: tuple) -> str:
+    return f"""📊 **Docker Compose File**
 
 **Structure:**
 • `version`: Compose version
-• `services`: {len(services)} service(s) - {', '.join(services[:3])}
+• `services`: {count} service(s) - {', '.join(first_services)}
 • `volumes`: Persistent storage
 • `networks`: Custom networks
 
 💡 Run with `docker-compose up -d`"""
-    
-    # Generic YAML
-    keys = list(parsed.keys())[:5]
+
+
+@functools.lru_cache(maxsize=256)
+def _generic_explanation(keys: tuple) -> str:
     return f"""📊 **YAML Structure**
 
 **Top-level keys:** {', '.join(keys)}
@@ -92,9 +136,32 @@ def analyze_yaml_structure(parsed: dict) -> str:
 💡 YAML uses indentation for nesting"""
 
 
-def get_common_errors() -> str:
-    """Return common YAML errors and fixes"""
-    return """⚠️ **Common YAML Errors:**
+def analyze_yaml_structure(parsed: object) -> str:
+    """Analyze YAML structure and provide explanation"""
+    if not isinstance(parsed, dict):
+        return f"📊 This YAML contains a {type(parsed).__name__}"
+    
+    keys = parsed.keys()
+    
+    # Check for Kubernetes manifest
+    if keys >= _K8S_KEYS:
+        return _k8s_explanation(str(parsed["kind"]), str(parsed["apiVersion"]))
+    
+    # Check for GitHub Actions
+    if "name" in keys and not keys.isdisjoint(_GHA_KEYS):
+        jobs = parsed.get("jobs", {}).keys()
+        return _gha_explanation(len(jobs), tuple(islice(jobs, 3)))
+    
+    # Check for Docker Compose
+    if not keys.isdisjoint(_COMPOSE_KEYS):
+        services = parsed.get("services", {}).keys()
+        return _compose_explanation(len(services), tuple(islice(services, 3)))
+    
+    # Generic YAML
+    return _generic_explanation(tuple(islice(keys, 5)))
+
+
+_COMMON_ERRORS = """⚠️ **Common YAML Errors:**
 
 1. **Indentation** - Use spaces, not tabs
 2. **Colons** - Need space after `key: value`
@@ -114,8 +181,12 @@ name:my-app  # No space after colon
 ```"""
 
 
-def get_yaml_menu():
-    return """📊 **YAML Validator + Explainer**
+def get_common_errors() -> str:
+    """Return common YAML errors and fixes"""
+    return _COMMON_ERRORS
+
+
+_YAML_MENU = """📊 **YAML Validator + Explainer**
 
 Send me any YAML to:
 • ✅ Validate syntax
@@ -131,11 +202,15 @@ Send me any YAML to:
 💡 _Just paste your YAML!_"""
 
 
+def get_yaml_menu() -> str:
+    return _YAML_MENU
+
+
 def yaml_to_json_preview(content: str) -> str:
     """Convert YAML to JSON preview"""
     try:
-        import json
-        parsed = yaml.safe_load(content)
-        return f"```json\n{json.dumps(parsed, indent=2)[:500]}\n```"
+        parsed = load_yaml(content)
+        preview = orjson.dumps(parsed, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        return f"```json\n{preview[:500]}\n```"
     except:
         return "❌ Could not convert to JSON"
@@ -6,13 +6,17 @@ FastAPI server with Telegram bot integration
 import os
 import asyncio
 import logging
+import httpx
+import orjson
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
 
+from app.bot import send_queue
 from app.bot.telegram_bot import create_bot_application
 from app.modules import docker_sandbox, kubernetes_concepts, yaml_validator
 from app.modules import cicd_visualizer, interview_qa, ai_error_explainer
@@ -32,8 +36,16 @@ async def lifespan(app: FastAPI):
     """Lifecycle manager for FastAPI"""
     global bot_app
     
+    # One pooled HTTP client for outgoing API calls, shared by the web app and the bot
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+    # Caps concurrent AI explanations from the web API
+    app.state.ai_sem = asyncio.Semaphore(16)
+    
     # Initialize OpenAI
-    ai_error_explainer.init_openai()
+    ai_error_explainer.init_openai(http_client=app.state.http)
     
     # Start Telegram bot
     bot_app = create_bot_application()
@@ -52,8 +64,13 @@ async def lifespan(app: FastAPI):
     # Cleanup
     if bot_app:
         await bot_app.updater.stop()
+        # Waits for running handlers, which may be waiting on queued replies
         await bot_app.stop()
+        await send_queue.stop()
         await bot_app.shutdown()
+    
+    await ai_error_explainer.close_openai()
+    await app.state.http.aclose()
 
 
 # Create FastAPI app
@@ -61,7 +78,8 @@ app = FastAPI(
     title="DevOps Learning Assistant",
     description="Learn Docker, Kubernetes, CI/CD, and more!",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS
@@ -76,6 +94,39 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory="public"), name="static")
 
 
+# Each module's STATIC_RESPONSES are returned by identity (the same dict every call), so
+# their JSON is encoded once here and looked up by id(). This relies on those dicts never
+# being mutated after import: a changed dict would still be served with its old bytes.
+_STATIC_JSON = {
+    id(response): orjson.dumps(response, option=orjson.OPT_NON_STR_KEYS)
+    for module in (docker_sandbox, kubernetes_concepts, cicd_visualizer)
+    for response in module.STATIC_RESPONSES
+}
+
+
+def _json_response(result: dict) -> Response:
+    """Serve a simulator result, skipping serialization for static responses"""
+    body = _STATIC_JSON.get(id(result))
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    return ORJSONResponse(result)
+
+
+# ============ Request Bodies ============
+
+class CommandBody(BaseModel):
+    command: str = ""
+
+
+class ContentBody(BaseModel):
+    content: str = ""
+
+
+class ExplainBody(BaseModel):
+    error: str = ""
+    lang: str = "en"
+
+
 # ============ API Routes ============
 
 @app.get("/")
@@ -92,22 +143,18 @@ async def health():
 
 # Docker API
 @app.post("/api/docker")
-async def docker_api(request: Request):
+async def docker_api(body: CommandBody):
     """Execute Docker command simulation"""
-    data = await request.json()
-    command = data.get("command", "")
-    result = docker_sandbox.simulate_docker(command)
-    return JSONResponse(result)
+    result = docker_sandbox.simulate_docker(body.command)
+    return _json_response(result)
 
 
 # Kubernetes API
 @app.post("/api/kubernetes")
-async def kubernetes_api(request: Request):
+async def kubernetes_api(body: CommandBody):
     """Execute kubectl command simulation"""
-    data = await request.json()
-    command = data.get("command", "")
-    result = kubernetes_concepts.simulate_kubectl(command)
-    return JSONResponse(result)
+    result = kubernetes_concepts.simulate_kubectl(body.command)
+    return _json_response(result)
 
 
 @app.get("/api/kubernetes/concept/{name}")
@@ -119,21 +166,18 @@ async def k8s_concept(name: str, lang: str = "en"):
 
 # YAML API
 @app.post("/api/yaml/validate")
-async def yaml_api(request: Request):
+async def yaml_api(body: ContentBody):
     """Validate YAML content"""
-    data = await request.json()
-    content = data.get("content", "")
-    result = yaml_validator.validate_yaml(content)
-    return JSONResponse(result)
+    return yaml_validator.validate_yaml(body.content)
 
 
 # CI/CD API
 @app.post("/api/cicd/visualize")
-async def cicd_api(request: Request):
+async def cicd_api(body: ContentBody):
     """Visualize CI/CD pipeline"""
-    data = await request.json()
-    content = data.get("content", "")
-    workflow = cicd_visualizer.parse_workflow(content)
+    workflow = await asyncio.get_running_loop().run_in_executor(
+        None, cicd_visualizer.parse_workflow, body.content
+    )
     return {
         "workflow": workflow,
         "visualization": cicd_visualizer.visualize_pipeline(workflow),
@@ -146,7 +190,7 @@ async def cicd_sample(name: str):
     """Get sample workflow"""
     sample = cicd_visualizer.get_sample(name)
     if sample:
-        return sample
+        return _json_response(sample)
     return {"error": "Sample not found"}
 
 
@@ -166,16 +210,35 @@ async def quiz_categories():
 
 # AI Error API
 @app.post("/api/explain")
-async def explain_api(request: Request):
+async def explain_api(request: Request, body: ExplainBody):
     """Explain error using AI"""
-    data = await request.json()
-    error_log = data.get("error", "")
-    lang = data.get("lang", "en")
-    explanation = await ai_error_explainer.explain_error(error_log, lang)
+    async with request.app.state.ai_sem:
+        explanation = await ai_error_explainer.explain_error(body.error, body.lang)
     return {"explanation": explanation}
 
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
+    # uvloop and httptools (shipped with uvicorn[standard]) are much faster than the defaults
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop=loop,
+        http=http,
+        # Auto-reload is for local development only
+        reload=os.getenv("RELOAD", "").lower() in ("1", "true", "yes"),
+        # Every worker starts its own Telegram poller, so keep this at 1 while the bot is enabled
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )